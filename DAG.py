@@ -1,11 +1,143 @@
 import random
+from array import array
+from collections.abc import Sequence
 from transactions import *
 
+class CausalHistory:
+    __slots__ = ("bits", "stride")
+
+    def __init__(self, stride=1):
+        """
+        Set of (replica, round) vertices stored as an integer bitset, with bit replica * stride + round.
+
+        The stride grows (and the bitset is re-encoded) when a vertex of a later round is added.
+
+        :param stride: Number of rounds stored per replica before the bitset has to be re-encoded.
+        """
+        self.bits = 0
+        self.stride = max(stride, 1)
+
+    def _grow(self, round):
+        """Re-encode the bitset with a stride large enough for round."""
+        vertices = list(self)
+        self.stride = max(round + 1, 2 * self.stride)
+        self.bits = 0
+        for replica, vertex_round in vertices:
+            self.bits |= 1 << (replica * self.stride + vertex_round)
+
+    def _bit(self, vertex):
+        replica, round = vertex
+        if replica < 0 or round < 0:
+            raise ValueError(f"Vertex {vertex} has a negative replica or round.")
+        if round >= self.stride:
+            self._grow(round)
+        return replica * self.stride + round
+
+    def add(self, vertex):
+        """Add a (replica, round) vertex."""
+        bit = self._bit(vertex)  # May re-encode self.bits
+        self.bits |= 1 << bit
+
+    def discard(self, vertex):
+        """Remove a (replica, round) vertex if present."""
+        if vertex in self:
+            self.bits &= ~(1 << self._bit(vertex))
+
+    def update(self, vertices):
+        """Add all (replica, round) vertices of an iterable."""
+        if isinstance(vertices, CausalHistory) and vertices.stride == self.stride:
+            self.bits |= vertices.bits
+            return
+        for vertex in vertices:
+            self.add(vertex)
+
+    def copy(self):
+        """Return a shallow copy."""
+        history = CausalHistory(self.stride)
+        history.bits = self.bits
+        return history
+
+    def __or__(self, other):
+        history = self.copy()
+        history.update(other)
+        return history
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def __eq__(self, other):
+        if isinstance(other, CausalHistory) and other.stride == self.stride:
+            return self.bits == other.bits
+        if isinstance(other, (CausalHistory, set, frozenset)):
+            return set(self) == set(other)
+        return NotImplemented
+
+    __hash__ = None  # Mutable, like set
+
+    def __contains__(self, vertex):
+        replica, round = vertex
+        return 0 <= replica and 0 <= round < self.stride and (self.bits >> (replica * self.stride + round)) & 1 == 1
+
+    def __iter__(self):
+        binary = bin(self.bits)[:1:-1]  # Least significant bit first
+        for bit, digit in enumerate(binary):
+            if digit == "1":
+                yield divmod(bit, self.stride)
+
+    def __len__(self):
+        return self.bits.bit_count()
+
+    def __repr__(self):
+        return repr(set(self))
+
+
+class IdTimePairs(Sequence):
+    __slots__ = ("_ids", "_times")
+
+    def __init__(self, ids, times):
+        """
+        Read-only view of a vertex's (ID, deliver_time) pairs over its array('i') / array('d') buffers.
+
+        To change the pairs of a vertex, assign a new list to DAGVertex.id_time_pairs.
+
+        :param ids: array('i') of transaction IDs.
+        :param times: array('d') of deliver times, aligned with ids.
+        """
+        self._ids = ids
+        self._times = times
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(zip(self._ids[index], self._times[index]))
+        return self._ids[index], self._times[index]
+
+    def __iter__(self):
+        return zip(self._ids, self._times)
+
+    def __eq__(self, other):
+        if isinstance(other, (IdTimePairs, list, tuple)):
+            return len(self) == len(other) and all(a == tuple(b) for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self):
+        return repr(list(self))
+
+
 class DAGVertex:
+    __slots__ = ("_ids", "_times", "_strong_edges", "is_leader", "round", "replica", "causal_history")
+
     def __init__(self, id_time_pairs = None, strong_edges = None, is_leader=False, round=0, replica = 0):
         """
         Initialize a DAGVertex object.
 
+        IDs, deliver times and strong edges are stored in array('i') / array('d') buffers and the
+        causal history in a CausalHistory bitset. id_time_pairs reads back as a read-only IdTimePairs view;
+        assign a new list to change it.
+
         :param id_time_pairs: List of (ID, deliver_time) pairs.
         :param strong_edges: List of indices representing strong edges to other vertices.
         :param is_leader: Boolean indicating if this vertex is a leader.
@@ -16,12 +148,34 @@ class DAGVertex:
         self.is_leader = is_leader
         self.round = round
         self.replica = replica
-        self.causal_history = set()  # New field to store the causal history of the vertex
+        self.causal_history = CausalHistory(round + 1)  # New field to store the causal history of the vertex
+
+    @property
+    def id_time_pairs(self):
+        if self._ids is None:
+            return None
+        return IdTimePairs(self._ids, self._times)
+
+    @id_time_pairs.setter
+    def id_time_pairs(self, pairs):
+        if pairs is None:
+            self._ids = self._times = None
+            return
+        self._ids = array("i", [pair[0] for pair in pairs])
+        self._times = array("d", [pair[1] for pair in pairs])
+
+    @property
+    def strong_edges(self):
+        return self._strong_edges
 
+    @strong_edges.setter
+    def strong_edges(self, edges):
+        self._strong_edges = array("i", edges) if edges is not None else None
 
     def __repr__(self):
         """Return a string representation of the DAGVertex object."""
-        return (f"DAGVertex(id_time_pairs={self.id_time_pairs}, strong_edges={self.strong_edges}, "
+        strong_edges = self.strong_edges.tolist() if self.strong_edges is not None else None
+        return (f"DAGVertex(id_time_pairs={self.id_time_pairs}, strong_edges={strong_edges}, "
                 f"is_leader={self.is_leader}, round={self.round}, "
                 f"causal_history={[v for v in self.causal_history]})")
 
@@ -31,7 +185,7 @@ def initialize_dag_vertices(transactions, n, t, num_slot):
     """
     Initialize n * 10 DAGVertex objects.
 
-    :param transactions: List of Transaction objects.
+    :param transactions: List of Transaction objects, or a CounterWorkload (one column regenerated at a time).
     :param n: Number of groups for the DAG vertices.
     :param t: Total number of transactions.
     :return: A 2D list of DAGVertex objects with dimensions n * 10.
@@ -45,7 +199,12 @@ def initialize_dag_vertices(transactions, n, t, num_slot):
     # Loop over each group
     for i in range(n):
         # Extract all deliver_times[i] from the transactions
-        deliver_times_with_ids = [(txn.ID, txn.deliver_time[i]) for txn in transactions]
+        if isinstance(transactions, CounterWorkload):
+            column = transactions.deliver_column(i)
+            order = transactions.order.tolist()
+            deliver_times_with_ids = list(zip(order, column[order].tolist()))
+        else:
+            deliver_times_with_ids = [(txn.ID, txn.deliver_time[i]) for txn in transactions]
 
         # Sort by deliver_time in ascending order
         deliver_times_with_ids.sort(key=lambda x: x[1])
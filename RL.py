@@ -12,9 +12,11 @@ def update_dependency_graph(dependency_graph, local_orderings, threshold):
     :param local_orderings: A dictionary where keys are indices of local orderings (0 to x-1),
                             and values are mappings of IDs to indices in the sorted order.
     :param threshold: A threshold value for adding edges between nodes
+    :return: List of (node_a, node_b) edges added to the dependency graph.
     """
 
     nodes = set()  # To collect all unique node IDs
+    added_edges = []
 
     # Extract all unique IDs
     for ordering in local_orderings:
@@ -45,9 +47,13 @@ def update_dependency_graph(dependency_graph, local_orderings, threshold):
             if weight_ab > weight_ba or (weight_ab == weight_ba and node_a < node_b):
                 if weight_ab >= threshold:
                     dependency_graph.add_edge(node_a, node_b)
+                    added_edges.append((node_a, node_b))
             elif weight_ba > weight_ab:
                 if weight_ba >= threshold:
                     dependency_graph.add_edge(node_b, node_a)
+                    added_edges.append((node_b, node_a))
+
+    return added_edges
 
 
 def update_dependency_graph_with_causal_history(dependency_graph, leader_vertex, dag_vertices, n, threshold):
@@ -57,10 +63,11 @@ def update_dependency_graph_with_causal_history(dependency_graph, leader_vertex,
 
     :param leader_vertex: The leader DAGVertex whose causal history is being processed.
     :param dag_vertices: A 2D list of DAGVertex objects representing the DAG (n x 10 structure).
+    :return: List of edges added to the dependency graph.
     """
     if not leader_vertex.is_leader:
         # print(f"Vertex {leader_vertex} is not a leader. Skipping.")
-        return
+        return []
 
     local_orderings = list()
     local_orderings_dict = {}
@@ -84,12 +91,12 @@ def update_dependency_graph_with_causal_history(dependency_graph, leader_vertex,
                 idx += 1
         local_orderings.append(local_ordering)
 
-    update_dependency_graph(dependency_graph, local_orderings, threshold)
+    return update_dependency_graph(dependency_graph, local_orderings, threshold)
 
     # print(f"Processed causal history for leader vertex: {leader_vertex}")
 
 
-def construct_dependency_graph(dependency_graph, dag_vertices, transactions, n, num_slot, f):
+def construct_dependency_graph(dependency_graph, dag_vertices, transactions, n, num_slot, f, ordering=None):
     """
         For every leader vertex in round-ascending order:
         1. Process the leader's causal history and update the `useful_timestamps` of transactions.
@@ -98,6 +105,7 @@ def construct_dependency_graph(dependency_graph, dag_vertices, transactions, n,
         :param dag_vertices: A 2D list of DAGVertex objects representing the DAG (n x 10 structure).
         :param transactions: A list of Transaction objects.
         :param n: The total number of processes (used to calculate f).
+        :param ordering: Optional IncrementalHamiltonianPath updated and snapshotted after every leader.
         """
     # Iterate through rounds in ascending order
     for round in range(0, num_slot - 1, 2):
@@ -107,7 +115,10 @@ def construct_dependency_graph(dependency_graph, dag_vertices, transactions, n,
                 # print(f"Processing leader at round {leader_vertex.round}: {leader_vertex}")
 
                 # Process causal history of the leader
-                update_dependency_graph_with_causal_history(dependency_graph, leader_vertex, dag_vertices, n, f+1)
+                added_edges = update_dependency_graph_with_causal_history(dependency_graph, leader_vertex, dag_vertices, n, f+1)
+                if ordering is not None:
+                    ordering.add_edges(added_edges)
+                    ordering.snapshot((i, round))
 
                 # print(f"Finished processing leader at round {leader_vertex.round}")
 
@@ -118,7 +129,10 @@ def construct_dependency_graph(dependency_graph, dag_vertices, transactions, n,
     # print(f"Processing leader at round {leader_vertex.round}: {leader_vertex}")
 
     # Process causal history of the leader
-    update_dependency_graph_with_causal_history(dependency_graph, leader_vertex, dag_vertices, n, (n-f)//2)
+    added_edges = update_dependency_graph_with_causal_history(dependency_graph, leader_vertex, dag_vertices, n, (n-f)//2)
+    if ordering is not None:
+        ordering.add_edges(added_edges)
+        ordering.snapshot((None, num_slot))
 
     # print(f"Finished processing leader at round {leader_vertex.round}")
 
@@ -0,0 +1,228 @@
+import math
+import os
+from collections import OrderedDict
+from multiprocessing import Pool
+
+
+class RunningStats:
+    def __init__(self):
+        """
+        Running count, mean and variance of a stream of values (Welford's algorithm).
+        """
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0  # Sum of squared differences from the mean
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value):
+        """
+        Add a single value to the running statistics.
+
+        :param value: The value to add.
+        """
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def merge(self, other):
+        """
+        Merge another RunningStats into this one (Chan et al. parallel update).
+
+        :param other: A RunningStats object built from a disjoint set of values.
+        """
+        if other.count == 0:
+            return
+        if self.count == 0:
+            self.count, self.mean, self.m2 = other.count, other.mean, other.m2
+            self.min, self.max = other.min, other.max
+            return
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def variance(self):
+        """Return the sample variance, or 0 for fewer than two values."""
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    def summary(self):
+        """Return the statistics as a dictionary."""
+        return {"count": self.count, "mean": self.mean, "variance": self.variance(),
+                "std": math.sqrt(self.variance()), "min": self.min, "max": self.max}
+
+
+class HistogramSketch:
+    def __init__(self, low, high, bins=200):
+        """
+        Fixed-range histogram used as a mergeable quantile sketch.
+
+        :param low: Lower bound of the value range; smaller values are counted in the first bin.
+        :param high: Upper bound of the value range; larger values are counted in the last bin.
+        :param bins: Number of equal-width bins (quantile error is at most one bin width).
+        """
+        self.low = low
+        self.high = high
+        self.counts = [0] * bins
+        self.total = 0
+
+    def add(self, value):
+        """
+        Add a single value to the sketch.
+
+        :param value: The value to add.
+        """
+        bins = len(self.counts)
+        idx = int((value - self.low) / (self.high - self.low) * bins)
+        self.counts[min(max(idx, 0), bins - 1)] += 1
+        self.total += 1
+
+    def merge(self, other):
+        """
+        Merge another sketch with the same range and number of bins into this one.
+
+        :param other: A HistogramSketch object.
+        """
+        if (other.low, other.high, len(other.counts)) != (self.low, self.high, len(self.counts)):
+            raise ValueError("Only sketches with the same range and bins can be merged.")
+        for i, count in enumerate(other.counts):
+            self.counts[i] += count
+        self.total += other.total
+
+    def quantile(self, q):
+        """
+        Estimate a quantile by linear interpolation inside the bin that contains it.
+
+        :param q: Quantile in [0, 1].
+        :return: The estimated value, or None if the sketch is empty.
+        """
+        if self.total == 0:
+            return None
+        width = (self.high - self.low) / len(self.counts)
+        target = q * self.total
+        cumulative = 0
+        for i, count in enumerate(self.counts):
+            if count and cumulative + count >= target:
+                return self.low + width * (i + (target - cumulative) / count)
+            cumulative += count
+        return self.high
+
+
+class TrialAggregator:
+    def __init__(self, quantiles=(0.05, 0.25, 0.5, 0.75, 0.95), bins=200):
+        """
+        Streaming summary of trial results, keyed by configuration.
+
+        Memory grows with the number of configurations and distances, not with the number of trials.
+
+        :param quantiles: Quantiles of the correlation reported by summary().
+        :param bins: Number of bins of each correlation quantile sketch.
+        """
+        self.quantiles = quantiles
+        self.bins = bins
+        self.configs = dict()  # config -> (RunningStats, HistogramSketch, {distance: RunningStats})
+
+    def _entry(self, config):
+        if config not in self.configs:
+            self.configs[config] = (RunningStats(), HistogramSketch(-1.0, 1.0, self.bins), dict())
+        return self.configs[config]
+
+    def add(self, config, correlation, distance_ratios=None):
+        """
+        Add the result of one trial.
+
+        :param config: Hashable configuration key, e.g. (protocol, t, n, is_leader_faulty).
+        :param correlation: Spearman correlation returned by correlation().
+        :param distance_ratios: Mapping of distance to correct ratio returned by calculate_distances_correct_ratio().
+        """
+        stats, sketch, ratios = self._entry(config)
+        stats.add(correlation)
+        sketch.add(correlation)
+        if distance_ratios is not None:
+            for distance, ratio in distance_ratios.items():
+                if distance not in ratios:
+                    ratios[distance] = RunningStats()
+                ratios[distance].add(ratio)
+
+    def merge(self, other):
+        """
+        Merge a partial aggregate, e.g. one produced by another process, into this one.
+
+        :param other: A TrialAggregator object.
+        """
+        for config, (other_stats, other_sketch, other_ratios) in other.configs.items():
+            stats, sketch, ratios = self._entry(config)
+            stats.merge(other_stats)
+            sketch.merge(other_sketch)
+            for distance, other_ratio in other_ratios.items():
+                if distance not in ratios:
+                    ratios[distance] = RunningStats()
+                ratios[distance].merge(other_ratio)
+        return self
+
+    def summary(self):
+        """
+        Summarize all configurations seen so far.
+
+        :return: A dictionary mapping each configuration to its correlation statistics, correlation
+                 quantiles and mean correct ratio per distance.
+        """
+        result = dict()
+        for config, (stats, sketch, ratios) in self.configs.items():
+            result[config] = {
+                "correlation": stats.summary(),
+                "quantiles": {q: sketch.quantile(q) for q in self.quantiles},
+                "distance_ratios": OrderedDict((distance, ratios[distance].mean) for distance in sorted(ratios)),
+            }
+        return result
+
+
+def _run_trials(args):
+    trial, config, num_trials = args
+    aggregator = TrialAggregator()
+    for _ in range(num_trials):
+        correlation, distance_ratios = trial(config)
+        aggregator.add(config, correlation, distance_ratios)
+    return aggregator
+
+
+def aggregate_trials(trial, configs, num_trials, processes=None, chunks_per_process=4, on_partial=None):
+    """
+    Run trials for every configuration in a process pool and merge the partial aggregates.
+
+    Each configuration's trials are split into processes x chunks_per_process chunks, so the number of tasks
+    is bounded regardless of num_trials, while partial results arrive (and are reported through on_partial)
+    every chunk rather than once per worker.
+
+    :param trial: Picklable function taking a configuration and returning (correlation, distance_ratios).
+    :param configs: List of hashable configurations.
+    :param num_trials: Number of trials per configuration.
+    :param processes: Number of worker processes (default: os.cpu_count()).
+    :param chunks_per_process: Number of chunks per worker process each configuration is split into.
+    :param on_partial: Optional function called with the running TrialAggregator after every merged chunk,
+                       e.g. to print aggregator.summary() as results come in.
+    :return: A TrialAggregator with all trial results.
+    """
+    processes = processes or os.cpu_count()
+    num_chunks = processes * chunks_per_process
+
+    def tasks():
+        for config in configs:
+            for chunk in range(num_chunks):
+                chunk_trials = num_trials // num_chunks + (chunk < num_trials % num_chunks)
+                if chunk_trials:
+                    yield trial, config, chunk_trials
+
+    aggregator = TrialAggregator()
+    with Pool(processes) as pool:
+        for partial in pool.imap_unordered(_run_trials, tasks()):
+            aggregator.merge(partial)
+            if on_partial is not None:
+                on_partial(aggregator)
+    return aggregator
@@ -30,9 +30,11 @@ def update_dependency_graph(dependency_graph, local_orderings, threshold):
     :param local_orderings: A dictionary where keys are indices of local orderings (0 to x-1),
                             and values are mappings of IDs to indices in the sorted order.
     :param threshold: A threshold value for adding edges between nodes
+    :return: List of (node_a, node_b) edges added to the dependency graph.
     """
 
     nodes = set()  # To collect all unique node IDs
+    added_edges = []
 
     # Extract all unique IDs
     for ordering in local_orderings:
@@ -56,9 +58,13 @@ def update_dependency_graph(dependency_graph, local_orderings, threshold):
             if weight_ab > weight_ba or (weight_ab == weight_ba and node_a < node_b):
                 if weight_ab >= threshold:
                     dependency_graph.add_edge(node_a, node_b)
+                    added_edges.append((node_a, node_b))
             elif weight_ba > weight_ab:
                 if weight_ba >= threshold:
                     dependency_graph.add_edge(node_b, node_a)
+                    added_edges.append((node_b, node_a))
+
+    return added_edges
 
 
 def find_hamiltonian_path(tournament_graph):
@@ -94,6 +100,88 @@ def find_hamiltonian_path(tournament_graph):
     return path
 
 
+class IncrementalHamiltonianPath:
+    def __init__(self, dependency_graph, recompute_share=0.5):
+        """
+        Maintain the insertion-order path of find_hamiltonian_path while edges are added to the graph.
+
+        Until the graph is a tournament, the path is only an insertion order: consecutive nodes need not be
+        joined by an edge, so snapshots taken before the last leader are not valid Hamiltonian paths. The
+        final order may also differ from find_hamiltonian_path on the final graph; use that for the result.
+
+        :param dependency_graph: A directed graph (networkx.DiGraph) whose edges are only ever added.
+        :param recompute_share: Share of the nodes above which add_edges recomputes the path from scratch
+                                instead of repositioning the touched nodes one by one.
+        """
+        self.dependency_graph = dependency_graph
+        self.recompute_share = recompute_share
+        self.path = find_hamiltonian_path(dependency_graph)
+        self.snapshots = []  # List of (label, path) pairs recorded by snapshot()
+
+    def _insert(self, node):
+        """Insert a node before the first node it has an edge to, or append it."""
+        for i, current_node in enumerate(self.path):
+            if self.dependency_graph.has_edge(node, current_node):
+                self.path.insert(i, node)
+                return
+        self.path.append(node)
+
+    def add_edges(self, edges):
+        """
+        Reposition the endpoints of newly added edges, and any node left next to a predecessor it has no
+        edge from; all other nodes keep their relative order. On a tournament the path stays valid.
+
+        Each re-insertion scans the path, so once a large share of the nodes is touched (e.g. 175, 271
+        and then all 300 of t=300 transactions at n=49) repositioning costs as much as a full recompute,
+        which is used instead.
+
+        :param edges: List of (node_a, node_b) edges that were just added to the dependency graph.
+        """
+        touched = set()
+        for node_a, node_b in edges:
+            touched.add(node_a)
+            touched.add(node_b)
+        if not touched:
+            return
+        limit = self.recompute_share * len(self.path)
+        if len(touched) > limit:
+            self.path = find_hamiltonian_path(self.dependency_graph)
+            return
+
+        # Remove touched nodes; where a removal brings u and v together without a u -> v edge,
+        # remove v as well so that it is re-inserted at a valid position
+        path = []
+        joined = False
+        for node in self.path:
+            if node in touched:
+                joined = True
+                continue
+            if joined and path and not self.dependency_graph.has_edge(path[-1], node):
+                touched.add(node)
+                if len(touched) > limit:
+                    self.path = find_hamiltonian_path(self.dependency_graph)
+                    return
+                continue
+            path.append(node)
+            joined = False
+        self.path = path
+
+        # Re-insert in the same (descending) order find_hamiltonian_path uses
+        for node in sorted(touched, reverse=True):
+            self._insert(node)
+
+    def snapshot(self, label=None):
+        """
+        Record a copy of the current path.
+
+        :param label: Identifier stored with the snapshot, e.g. the (replica, round) of the leader.
+        :return: A copy of the current path.
+        """
+        path = list(self.path)
+        self.snapshots.append((label, path))
+        return path
+
+
 def __test__():
     t = 5
     s = 100
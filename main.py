@@ -5,6 +5,7 @@ from update_pos import *
 from spearman import *
 from RL import *
 from distance import *
+from network import *
 
 
 def Run_Themis(dg, n, t, s, d, num_slot, transactions, deliver_based, is_leader_faulty, distances):
@@ -31,21 +32,28 @@ def Run_Themis(dg, n, t, s, d, num_slot, transactions, deliver_based, is_leader_
     
 
 
-def Run_FairDAG_RL(dg, transactions, n, t, s, d, num_slot, deliver_based, is_leader_faulty, distances):
+def Run_FairDAG_RL(dg, transactions, n, t, s, d, num_slot, deliver_based, is_leader_faulty, distances, event_driven=False):
     f = (n-1)//3
 
     if is_leader_faulty:
         update_transaction_deliver_times(transactions, t, n, s, d, num_slot, (n-1)//3)
 
-    dag_vertices = initialize_dag_vertices(transactions, n, t, num_slot)
+    if event_driven:
+        dag_vertices = simulate_dag_vertices(transactions, n, num_slot, d)
+    else:
+        dag_vertices = initialize_dag_vertices(transactions, n, t, num_slot)
     find_and_update_causal_history(dag_vertices, num_slot, n)
     for current_round in range(0, num_slot, 2):
         for replica in range(n):
             leader_vertex = dag_vertices[replica][current_round]
 
-    construct_dependency_graph(dg, dag_vertices, transactions, n, num_slot, f)
+    ordering = IncrementalHamiltonianPath(dg)
+    construct_dependency_graph(dg, dag_vertices, transactions, n, num_slot, f, ordering)
     adj_matrix = nx.to_numpy_array(dg, nodelist=sorted(dg.nodes()))
 
+    for (leader_replica, leader_round), snapshot in ordering.snapshots:
+        print("FairDAG_RL Round", leader_round, "Leader", leader_replica, "Path: ", snapshot)
+
     path = find_hamiltonian_path(dg)
     Themis_update_positions(transactions, path)
 
@@ -59,6 +67,40 @@ def Run_FairDAG_RL(dg, transactions, n, t, s, d, num_slot, deliver_based, is_lea
     return correlation(transactions, deliver_based), calculate_distances_correct_ratio(transactions, distances)
 
 
+def Run_Pompe(transactions, n, t, s, d, num_slot, deliver_based, is_leader_faulty, distances):
+    f = (n-1)//3
+
+    if is_leader_faulty:
+        update_transaction_deliver_times(transactions, t, n, s, d, num_slot, (n-1)//3)
+
+    assign_timestamps(transactions, f, f if is_leader_faulty else 0)
+    update_positions(transactions)
+
+    print("Pompe Path: ", [transaction.ID for transaction in transactions])
+    return correlation(transactions, deliver_based), calculate_distances_correct_ratio(transactions, distances)
+
+
+def Run_FairDAG_TS(transactions, n, t, s, d, num_slot, deliver_based, is_leader_faulty, distances, event_driven=False):
+    f = (n-1)//3
+
+    if is_leader_faulty:
+        update_transaction_deliver_times(transactions, t, n, s, d, num_slot, (n-1)//3)
+
+    if event_driven:
+        dag_vertices = simulate_dag_vertices(transactions, n, num_slot, d)
+    else:
+        dag_vertices = initialize_dag_vertices(transactions, n, t, num_slot)
+    find_and_update_causal_history(dag_vertices, num_slot, n)
+
+    DAG_assign_timestamps(transactions, dag_vertices, n, num_slot, f)
+    DAG_update_positions(transactions)
+    path = [transaction.ID for transaction in transactions]
+    Themis_update_positions(transactions, path)
+
+    print("FairDAG_TS Path: ", path)
+    return correlation(transactions, deliver_based), calculate_distances_correct_ratio(transactions, distances)
+
+
 def RL_Fairness_Test():
     t = 200
     s = 1
@@ -77,7 +119,13 @@ def RL_Fairness_Test():
 
     value1, distance_value1 = Run_Themis(initiate_dependency_graph(t), n, t, s, d, num_slot, transactions, deliver_based, is_leader_faulty, distances)
     value2, distance_value2 = Run_FairDAG_RL(initiate_dependency_graph(t), transactions, n, t, s, d, num_slot, deliver_based, is_leader_faulty, distances)
+    value3, distance_value3 = Run_Pompe(transactions, n, t, s, d, num_slot, deliver_based, is_leader_faulty, distances)
+    value4, distance_value4 = Run_FairDAG_TS(transactions, n, t, s, d, num_slot, deliver_based, is_leader_faulty, distances)
+    value5, distance_value5 = Run_FairDAG_RL(initiate_dependency_graph(t), transactions, n, t, s, d, num_slot, deliver_based, is_leader_faulty, distances, event_driven=True)
     print("Themis Correlation: ", value1, distance_value1)
     print("FairDAG_RL Correlation: ", value2, distance_value2)
+    print("Pompe Correlation: ", value3, distance_value3)
+    print("FairDAG_TS Correlation: ", value4, distance_value4)
+    print("FairDAG_RL (event-driven) Correlation: ", value5, distance_value5)
 
 RL_Fairness_Test()
\ No newline at end of file
@@ -0,0 +1,161 @@
+import heapq
+from DAG import *
+
+
+# Event kinds, ordered so that a broadcast is handled before a quorum check at the same time.
+# Events are compact (time, kind, replica, round) tuples; a quorum event covers a whole round.
+BROADCAST = 0
+QUORUM = 1
+
+
+class RoundState:
+    def __init__(self, n, quorum):
+        """
+        Per-round bookkeeping of vertex arrivals at every replica.
+
+        Only the `quorum` earliest arrivals per receiver are kept, so memory is n x quorum per active round.
+
+        :param n: Number of replicas.
+        :param quorum: Number of vertices needed to advance to the next round (2f+1).
+        """
+        self.arrivals = np.empty((n, quorum))  # arrivals[q, k]: k-th kept arrival time at replica q
+        self.senders = np.empty((n, quorum), dtype=np.int32)  # senders[q, k]: sender of that vertex
+        self.count = 0  # Number of vertices broadcast in this round so far
+        self.kth = np.full(n, np.inf)  # Time replica q holds `quorum` vertices (given arrivals so far)
+        self.done = np.zeros(n, dtype=bool)  # Whether replica q already advanced past this round
+        self.scheduled = np.inf  # Time of the pending quorum event of this round
+
+
+def simulate_dag_vertices(transactions, n, num_slot, d, round_interval=None, seed=None):
+    """
+    Build the DAG from a discrete-event simulation of transaction dissemination and vertex broadcast.
+
+    A replica includes a transaction in its next vertex once the transaction has reached it (receive_time),
+    and records it with its deliver_time. A replica broadcasts its round-r vertex once it holds 2f+1
+    round r-1 vertices (its strong edges) and at least round_interval has passed since its previous vertex.
+    Vertex delays are exponential with mean d. Round-0 vertices are broadcast at round_interval and the last
+    round's vertices include every remaining transaction.
+
+    :param transactions: List of Transaction objects.
+    :param n: Number of replicas.
+    :param num_slot: Number of rounds.
+    :param d: Mean delay of vertex messages.
+    :param round_interval: Minimum time between two vertices of a replica (default: last receive_time / num_slot).
+    :param seed: Seed of the vertex delays (default: drawn from the random module).
+    :return: A 2D list of DAGVertex objects with dimensions n x num_slot, as initialize_dag_vertices.
+    """
+    f = (n - 1) // 3
+    quorum = 2*f+1
+    rng = np.random.default_rng(random.getrandbits(64) if seed is None else seed)
+
+    deliver, receive = delivery_matrices(transactions)
+    if round_interval is None:
+        round_interval = receive.max() / num_slot
+    # Per replica, transactions in the order they reach it
+    receive_order = np.argsort(receive, axis=0, kind="stable")
+    sorted_receive = np.take_along_axis(receive, receive_order, axis=0)
+    included = np.zeros(n, dtype=np.int64)  # Number of transactions each replica has put in a vertex
+    broadcast_times = np.full((n, num_slot), np.inf)  # Time each vertex was broadcast
+
+    dag_vertices = [[None] * num_slot for _ in range(n)]
+    strong_edges = dict()  # (replica, round) -> strong edges of the vertex waiting to be broadcast
+    quorums = dict()  # (replica, round) -> (time, senders) of a quorum reached before the replica's own vertex
+    rounds = dict()  # round -> RoundState of rounds still forming, None once every replica advanced
+    events = [(round_interval, BROADCAST, replica, 0) for replica in range(n)]
+    heapq.heapify(events)
+    num_events = 0
+    num_messages = 0
+
+    def schedule_next(replica, round):
+        # Advance once the replica both broadcast its own round vertex and holds 2f+1 round vertices
+        time, senders = quorums.pop((replica, round))
+        strong_edges[(replica, round + 1)] = senders
+        broadcast_time = max(time, broadcast_times[replica, round] + round_interval)
+        heapq.heappush(events, (float(broadcast_time), BROADCAST, replica, round + 1))
+
+    def schedule_quorum(round, state):
+        # Keep one quorum event per round, at the earliest quorum time of a replica still waiting
+        pending = state.kth[~state.done]
+        if len(pending) == 0:
+            rounds[round] = None
+            return
+        earliest = float(pending.min())
+        if earliest < state.scheduled:
+            state.scheduled = earliest
+            heapq.heappush(events, (earliest, QUORUM, -1, round))
+
+    while events:
+        time, kind, replica, round = heapq.heappop(events)
+        num_events += 1
+
+        if kind == BROADCAST:
+            # Batch of transactions that reached the replica since its previous vertex
+            start = included[replica]
+            end = len(transactions) if round == num_slot - 1 else \
+                np.searchsorted(sorted_receive[:, replica], time, side="right")
+            ids = receive_order[start:end, replica]
+            ids = ids[np.argsort(deliver[ids, replica], kind="stable")]
+            included[replica] = end
+            broadcast_times[replica, round] = time
+            id_time_pairs = list(zip(ids.tolist(), deliver[ids, replica].tolist()))
+            dag_vertices[replica][round] = DAGVertex(id_time_pairs=id_time_pairs, round=round, replica=replica,
+                                                     strong_edges=strong_edges.pop((replica, round), []))
+            if round == num_slot - 1:
+                continue
+            if (replica, round) in quorums:
+                schedule_next(replica, round)
+
+            # Arrival of the vertex at every replica, drawn as one batch
+            arrivals = time + rng.exponential(d, n)
+            arrivals[replica] = time
+            num_messages += n
+            if round not in rounds:
+                rounds[round] = RoundState(n, quorum)
+            state = rounds[round]
+            if state is None:
+                continue  # Every replica already advanced past this round
+            if state.count < quorum:
+                state.arrivals[:, state.count] = arrivals
+                state.senders[:, state.count] = replica
+                state.count += 1
+                if state.count < quorum:
+                    continue
+                state.kth = state.arrivals.max(axis=1)
+            else:
+                # Replace the latest kept arrival at receivers where this vertex arrives earlier
+                receivers = np.nonzero(~state.done & (arrivals < state.kth))[0]
+                kept = state.arrivals[receivers]
+                latest = kept.argmax(axis=1)
+                kept[np.arange(len(receivers)), latest] = arrivals[receivers]
+                state.arrivals[receivers, latest] = arrivals[receivers]
+                state.senders[receivers, latest] = replica
+                state.kth[receivers] = kept.max(axis=1)
+            schedule_quorum(round, state)
+
+        elif kind == QUORUM:
+            state = rounds.get(round)
+            if state is None or time != state.scheduled:
+                continue  # Stale: an earlier arrival moved the quorum event forward
+            # No event before the next one in the heap can change this round's arrivals,
+            # so every replica whose quorum time falls before it advances in one batch
+            horizon = events[0][0] if events else np.inf
+            ready = np.nonzero(~state.done & (state.kth <= horizon))[0]
+            state.done[ready] = True
+            for receiver in ready[np.argsort(state.kth[ready], kind="stable")].tolist():
+                quorums[(receiver, round)] = (float(state.kth[receiver]), sorted(state.senders[receiver].tolist()))
+                if broadcast_times[receiver, round] <= state.kth[receiver]:
+                    schedule_next(receiver, round)
+            state.scheduled = np.inf
+            schedule_quorum(round, state)
+
+    missing = [(i, j) for i in range(n) for j in range(num_slot) if dag_vertices[i][j] is None]
+    if missing:
+        raise RuntimeError(f"Simulation ended without broadcasting vertices {missing[:10]} "
+                           f"({len(missing)} of {n * num_slot} missing).")
+
+    for j in range(0, num_slot, 2):
+        leader_idx = random.choice(range(n))
+        dag_vertices[leader_idx][j].is_leader = True
+
+    print("Simulated", num_events, "events and", num_messages, "vertex messages")
+    return dag_vertices
@@ -0,0 +1,332 @@
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+from RL import *
+from update_pos import *
+
+
+PROTOCOLS = ("themis", "fairdag_rl", "pompe", "fairdag_ts")
+
+DEFAULT_SCENARIO = {"t": 200, "s": 1, "d": 100, "n": 49, "seed": 0, "num_slot": 5,
+                    "is_leader_faulty": False, "deliver_based": True}
+
+
+class LRUCache:
+    def __init__(self, maxsize=32):
+        """
+        Least-recently-used cache of asyncio futures, so concurrent requests share one computation.
+
+        :param maxsize: Maximum number of entries kept.
+        """
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+
+    def get(self, key):
+        """Return the cached future for key (marking it recently used), or None."""
+        if key not in self.entries:
+            return None
+        self.entries.move_to_end(key)
+        return self.entries[key]
+
+    def put(self, key, future):
+        """Store a future, evicting the least recently used entry when full."""
+        self.entries[key] = future
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def discard(self, key):
+        """Remove key if present."""
+        self.entries.pop(key, None)
+
+
+# Stages below run in worker processes; they only take and return picklable values.
+
+def _generate_workload(t, s, d, n, seed):
+    random.seed(seed)
+    transactions = generate_transactions(t, s, d, n)
+    transactions = sort_transactions_by_average_deliver_time(transactions)
+    deliver, receive = delivery_matrices(transactions)
+    deliver_ID = np.array([txn.deliver_ID for txn in sorted(transactions, key=lambda txn: txn.ID)])
+    return deliver, receive, deliver_ID
+
+
+def _faulty_deliver(deliver, deliver_ID, t, s, d, f):
+    # Matrix form of update_transaction_deliver_times
+    deliver = deliver.copy()
+    deliver[:, :f] = (d + s * (t - deliver_ID))[:, None]
+    return deliver
+
+
+def _rank_matrix(deliver):
+    # ranks[ID, i] is the index of transaction ID in the local ordering of replica i
+    ranks = np.empty(deliver.shape, dtype=np.int32)
+    order = np.argsort(deliver, axis=0, kind="stable")
+    np.put_along_axis(ranks, order, np.arange(deliver.shape[0], dtype=np.int32)[:, None], axis=0)
+    return ranks
+
+
+def _weight_matrix(ranks, replicas):
+    # weights[a, b] is the number of the first `replicas` local orderings placing a before b
+    t = ranks.shape[0]
+    weights = np.zeros((t, t), dtype=np.int32)
+    for i in range(replicas):
+        column = ranks[:, i]
+        weights += column[:, None] < column[None, :]
+    return weights
+
+
+def _distance_matrix(weights, n):
+    # Matrix form of calculate_distances: n - 2 * (number of replicas delivering b before a)
+    return n - 2 * weights.T
+
+
+def _hamiltonian_path(adjacency):
+    # Matrix form of find_hamiltonian_path
+    t = adjacency.shape[0]
+    path = [t - 1]
+    for node in range(t - 2, -1, -1):
+        successors = adjacency[node, path]
+        if successors.any():
+            path.insert(int(successors.argmax()), node)
+        else:
+            path.append(node)
+    return np.array(path)
+
+
+def _run_themis(weights, threshold):
+    # Matrix form of update_dependency_graph on an empty graph with complete local orderings
+    ids = np.arange(weights.shape[0])
+    forward = (weights > weights.T) | ((weights == weights.T) & (ids[:, None] < ids[None, :]))
+    return _hamiltonian_path(forward & (weights >= threshold))
+
+
+def _build_dag(deliver, receive, s, n, num_slot, seed):
+    transactions = [Transaction(ID=ID, send_time=s * ID, deliver_time=list(deliver[ID]), receive_time=list(receive[ID]))
+                    for ID in range(deliver.shape[0])]
+    transactions = sort_transactions_by_average_deliver_time(transactions)
+    random.seed(seed)
+    dag_vertices = initialize_dag_vertices(transactions, n, len(transactions), num_slot)
+    find_and_update_causal_history(dag_vertices, num_slot, n)
+    return transactions, dag_vertices
+
+
+def _run_fairdag_rl(deliver, receive, s, n, num_slot, seed):
+    with contextlib.redirect_stdout(io.StringIO()):
+        transactions, dag_vertices = _build_dag(deliver, receive, s, n, num_slot, seed)
+        dg = initiate_dependency_graph(len(transactions))
+        construct_dependency_graph(dg, dag_vertices, transactions, n, num_slot, (n-1)//3)
+        return np.array(find_hamiltonian_path(dg))
+
+
+def _run_fairdag_ts(deliver, receive, s, n, num_slot, seed, reference):
+    with contextlib.redirect_stdout(io.StringIO()):
+        transactions, dag_vertices = _build_dag(deliver, receive, s, n, num_slot, seed)
+        timestamps, _ = DAG_timestamps(dag_vertices, len(transactions), n, num_slot, (n-1)//3)
+    return reference[np.argsort(timestamps[reference], kind="stable")]
+
+
+def _run_pompe(deliver, receive, f):
+    timestamps, _ = pompe_timestamps(deliver, receive, f)
+    return np.argsort(timestamps, kind="stable")
+
+
+def _evaluate(path, reference, distances):
+    # Matrix forms of correlation() and calculate_distances_correct_ratio()
+    t = len(path)
+    rho = 1 - 6 * float(((reference - path) ** 2).sum()) / (t * (t ** 2 - 1))
+
+    pos = np.empty(t, dtype=np.int64)
+    pos[path] = np.arange(t)
+    a, b = np.triu_indices(t, 1)
+    distance = distances[a, b]
+    before = pos[a] < pos[b]
+    correct = (before & (distance > 0)) | (~before & (distance < 0))
+    distance = np.abs(distance)
+    total = np.bincount(distance)
+    hits = np.bincount(distance, weights=correct)
+    ratios = OrderedDict((int(k), float(hits[k] / total[k])) for k in np.nonzero(total)[0])
+    return rho, ratios
+
+
+class SimulationService:
+    def __init__(self, workers=None, cache_size=32):
+        """
+        Long-lived simulation service keeping workloads and intermediate matrices warm.
+
+        :param workers: Number of worker processes for CPU-bound stages (default: os.cpu_count()).
+        :param cache_size: Number of entries kept in each LRU cache.
+        """
+        self.pool = ProcessPoolExecutor(workers)
+        self.workloads = LRUCache(cache_size)
+        self.delivers = LRUCache(cache_size)
+        self.ranks = LRUCache(cache_size)
+        self.weights = LRUCache(cache_size)
+        self.distances = LRUCache(cache_size)
+        self.results = LRUCache(cache_size * len(PROTOCOLS))
+        self.evaluations = LRUCache(cache_size * len(PROTOCOLS))
+
+    async def _stage(self, cache, key, fn, *args, progress=None, name=None):
+        """
+        Return the cached result of fn(*args), running it in the worker pool on a miss.
+
+        :param cache: The LRUCache holding this stage.
+        :param key: Cache key of the stage.
+        :param progress: Optional coroutine function called with a progress message.
+        :param name: Stage name reported in progress messages.
+        """
+        future = cache.get(key)
+        cached = future is not None
+        if not cached:
+            loop = asyncio.get_running_loop()
+            future = asyncio.ensure_future(loop.run_in_executor(self.pool, fn, *args))
+            cache.put(key, future)
+        start = time.perf_counter()
+        try:
+            result = await future
+        except Exception:
+            cache.discard(key)
+            raise
+        if progress is not None:
+            await progress({"event": "progress", "stage": name, "cached": cached,
+                            "elapsed": time.perf_counter() - start})
+        return result
+
+    async def _workload(self, scenario, progress):
+        key = (scenario["t"], scenario["s"], scenario["d"], scenario["n"], scenario["seed"])
+        return key, await self._stage(self.workloads, key, _generate_workload, *key,
+                                      progress=progress, name="workload")
+
+    async def _deliver(self, scenario, f, progress):
+        """Return (key, deliver matrix) of the workload, with the first f replicas made faulty."""
+        key, (deliver, receive, deliver_ID) = await self._workload(scenario, progress)
+        if not f:
+            return key + (0,), deliver
+        return key + (f,), await self._stage(self.delivers, key + (f,), _faulty_deliver, deliver, deliver_ID,
+                                             scenario["t"], scenario["s"], scenario["d"], f,
+                                             progress=progress, name="deliver")
+
+    async def _weights(self, scenario, f, replicas, progress):
+        key, deliver = await self._deliver(scenario, f, progress)
+        ranks = await self._stage(self.ranks, key, _rank_matrix, deliver, progress=progress, name="ranks")
+        return await self._stage(self.weights, key + (replicas,), _weight_matrix, ranks, replicas,
+                                 progress=progress, name="weights")
+
+    async def _path(self, protocol, scenario, reference, progress):
+        """Return (key, path) of a protocol, where key identifies the result in the results cache."""
+        t, s, n, num_slot, seed = scenario["t"], scenario["s"], scenario["n"], scenario["num_slot"], scenario["seed"]
+        faulty = scenario["is_leader_faulty"]
+        workload_key, (deliver, receive, deliver_ID) = await self._workload(scenario, progress)
+        key = workload_key + (protocol, faulty, num_slot)
+
+        if protocol == "themis":
+            f = (n-1)//4
+            weights = await self._weights(scenario, f if faulty else 0, n-2*f, progress)
+            return key, await self._stage(self.results, key, _run_themis, weights, f+1,
+                                          progress=progress, name=protocol)
+
+        f = (n-1)//3
+        _, deliver = await self._deliver(scenario, f if faulty else 0, progress)
+        if protocol == "pompe":
+            return key, await self._stage(self.results, key, _run_pompe, deliver, receive, f,
+                                          progress=progress, name=protocol)
+        if protocol == "fairdag_rl":
+            return key, await self._stage(self.results, key, _run_fairdag_rl, deliver, receive, s, n, num_slot,
+                                          seed, progress=progress, name=protocol)
+        if protocol == "fairdag_ts":
+            # Ties between timestamps are broken by the reference order, which depends on deliver_based
+            key = key + (scenario["deliver_based"],)
+            return key, await self._stage(self.results, key, _run_fairdag_ts, deliver, receive, s, n, num_slot,
+                                          seed, reference, progress=progress, name=protocol)
+
+    async def run(self, request, send):
+        """
+        Run every protocol of a request, streaming progress and results through send.
+
+        :param request: A dictionary with optional "id", "scenario" and "protocols" entries.
+        :param send: Coroutine function called with every message (a JSON-serializable dictionary).
+        """
+        request_id = request.get("id")
+        scenario = dict(DEFAULT_SCENARIO, **request.get("scenario", {}))
+        protocols = request.get("protocols", PROTOCOLS)
+        for protocol in protocols:
+            if protocol not in PROTOCOLS:
+                raise ValueError(f"Unknown protocol {protocol}, expected one of {PROTOCOLS}.")
+
+        async def progress(message):
+            await send(dict(message, id=request_id))
+
+        t, n = scenario["t"], scenario["n"]
+        workload_key, (deliver, receive, deliver_ID) = await self._workload(scenario, progress)
+        reference = np.argsort(deliver_ID, kind="stable") if scenario["deliver_based"] else np.arange(t)
+        weights = await self._weights(scenario, 0, n, progress)
+        distances = await self._stage(self.distances, workload_key, _distance_matrix, weights, n,
+                                      progress=progress, name="distances")
+
+        async def run_protocol(protocol):
+            start = time.perf_counter()
+            key, path = await self._path(protocol, scenario, reference, progress)
+            rho, ratios = await self._stage(self.evaluations, (key, scenario["deliver_based"]), _evaluate,
+                                            path, reference, distances, progress=progress, name="evaluate")
+            await progress({"event": "result", "protocol": protocol, "correlation": rho,
+                            "distance_ratios": ratios, "path": path.tolist(),
+                            "elapsed": time.perf_counter() - start})
+
+        await asyncio.gather(*(run_protocol(protocol) for protocol in protocols))
+        await progress({"event": "done"})
+
+    async def handle(self, reader, writer):
+        """Serve newline-delimited JSON requests on one connection."""
+        async def send(message):
+            writer.write((json.dumps(message) + "\n").encode())
+            await writer.drain()
+
+        try:
+            while line := await reader.readline():
+                try:
+                    await self.run(json.loads(line), send)
+                except Exception as e:
+                    await send({"event": "error", "message": f"{type(e).__name__}: {e}"})
+        finally:
+            writer.close()
+
+    def close(self):
+        """Shut down the worker pool."""
+        self.pool.shutdown(cancel_futures=True)
+
+
+async def serve(host="127.0.0.1", port=8765, unix_path=None, workers=None, cache_size=32):
+    """
+    Start the service on a TCP port, or on a Unix socket if unix_path is given, and serve forever.
+
+    Clients send one JSON request per line, e.g.
+    {"id": 1, "scenario": {"t": 200, "n": 49, "seed": 3}, "protocols": ["themis", "pompe"]},
+    and receive one JSON message per line: progress events, one result per protocol, then "done".
+    """
+    service = SimulationService(workers, cache_size)
+    if unix_path is not None:
+        server = await asyncio.start_unix_server(service.handle, path=unix_path)
+    else:
+        server = await asyncio.start_server(service.handle, host, port)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local fairness simulation service.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", dest="unix_path", default=None, help="Serve on this Unix socket instead of TCP.")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--cache-size", type=int, default=32)
+    args = parser.parse_args()
+    asyncio.run(serve(args.host, args.port, args.unix_path, args.workers, args.cache_size))
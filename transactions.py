@@ -1,12 +1,20 @@
 import statistics
 import random
+from array import array
+import numpy as np
 
 class Transaction:
+    __slots__ = ("ID", "send_time", "_deliver_time", "_receive_time", "assigned_timestamp", "num_correct", "pos",
+                 "DAG_assigned_timestamp", "useful_timestamps", "DAG_num_correct", "DAG_pos",
+                 "average_deliver_time", "deliver_ID")
+
     def __init__(self, ID, send_time, deliver_time=None, receive_time=None, assigned_timestamp=None, num_correct=0, pos=None,
                  DAG_assigned_timestamp=None, useful_timestamps=None, DAG_num_correct=0, DAG_pos=None):
         """
         Initialize a Transaction object.
 
+        deliver_time and receive_time are stored in array('d') buffers.
+
         :param ID: Unique identifier for the transaction (str or int).
         :param send_time: Time when the transaction was sent.
         :param deliver_time: List of times when the transaction was delivered (list).
@@ -33,23 +41,162 @@ class Transaction:
         self.average_deliver_time = statistics.mean(deliver_time)
         self.deliver_ID = ID
 
+    @property
+    def deliver_time(self):
+        return self._deliver_time
+
+    @deliver_time.setter
+    def deliver_time(self, values):
+        self._deliver_time = array("d", values)
+
+    @property
+    def receive_time(self):
+        return self._receive_time
+
+    @receive_time.setter
+    def receive_time(self, values):
+        self._receive_time = array("d", values)
+
     def __repr__(self):
         """Return a string representation of the Transaction object."""
         return (f"Transaction(ID={self.ID}, send_time={self.send_time}, "
-                f"deliver_time={self.deliver_time}, assigned_timestamp={self.assigned_timestamp}, "
+                f"deliver_time={self.deliver_time.tolist()}, assigned_timestamp={self.assigned_timestamp}, "
                 f"num_correct={self.num_correct}, pos={self.pos}, "
                 f"DAG_assigned_timestamp={self.DAG_assigned_timestamp}, "
                 f"useful_timestamps={self.useful_timestamps}, "
                 f"DAG_num_correct={self.DAG_num_correct}, DAG_pos={self.DAG_pos})")
 
 
+class CounterWorkload:
+    def __init__(self, t, s, d, n, seed=0):
+        """
+        Workload whose delivery columns are regenerated on demand instead of stored.
+
+        Delays come from a counter-based RNG (Philox keyed by seed and replica, counter = transaction ID),
+        so any column, or block of a column, is reproduced exactly in O(t) memory. Only the per-column
+        consumers (iter_local_orderings, initialize_dag_vertices) stay O(t); generate_local_orderings and
+        transactions() materialize all n columns, O(n x t).
+
+        :param t: Number of transactions.
+        :param s: Multiplier for send_time.
+        :param d: Mean delay for exponential distribution.
+        :param n: Number of replicas.
+        :param seed: Seed of the workload.
+        """
+        self.t = t
+        self.s = s
+        self.d = d
+        self.n = n
+        self.seed = seed
+        self._deliver_ID = None  # Array of deliver_ID by transaction ID, set by sort_by_average_deliver_time()
+        self._order = None  # Transaction IDs in deliver_ID order
+        self.faulty = 0  # Number of leading replicas whose deliver_time is overridden
+
+    @property
+    def deliver_ID(self):
+        """Array of deliver_ID by transaction ID, sorting the workload on first use."""
+        if self._deliver_ID is None:
+            self.sort_by_average_deliver_time()
+        return self._deliver_ID
+
+    @property
+    def order(self):
+        """Transaction IDs in deliver_ID order, sorting the workload on first use."""
+        if self._order is None:
+            self.sort_by_average_deliver_time()
+        return self._order
+
+    def _delays(self, replica, start, stop):
+        # Block of transaction ID uses Philox counter ID: word 0 is the deliver delay, word 1 the receive delay
+        raw = np.random.Philox(key=[self.seed, replica], counter=start).random_raw(4 * (stop - start))
+        uniform = (raw.reshape(-1, 4)[:, :2] >> np.uint64(11)) * (1.0 / (1 << 53))
+        return -self.d * np.log1p(-uniform)
+
+    def _original_deliver_column(self, replica, start, stop):
+        return self.s * np.arange(start, stop) + self._delays(replica, start, stop)[:, 0]
+
+    def deliver_column(self, replica, start=0, stop=None):
+        """
+        Regenerate deliver_time[replica] of transactions start to stop-1.
+
+        :param replica: Index of the replica.
+        :param start: First transaction ID.
+        :param stop: One past the last transaction ID (default: t).
+        :return: A numpy array indexed by transaction ID - start.
+        """
+        stop = self.t if stop is None else stop
+        if replica < self.faulty:
+            return (self.d + self.s * (self.t - self.deliver_ID[start:stop])).astype(float)
+        return self._original_deliver_column(replica, start, stop)
+
+    def receive_column(self, replica, start=0, stop=None):
+        """
+        Regenerate receive_time[replica] of transactions start to stop-1.
+
+        :param replica: Index of the replica.
+        :param start: First transaction ID.
+        :param stop: One past the last transaction ID (default: t).
+        :return: A numpy array indexed by transaction ID - start.
+        """
+        stop = self.t if stop is None else stop
+        delays = self._delays(replica, start, stop)
+        return self.s * np.arange(start, stop) + delays[:, 0] + delays[:, 1]
+
+    def deliver_block(self, replicas, start=0, stop=None):
+        """Return a (stop-start) x len(replicas) matrix of deliver_time columns."""
+        return np.column_stack([self.deliver_column(i, start, stop) for i in replicas])
+
+    def receive_block(self, replicas, start=0, stop=None):
+        """Return a (stop-start) x len(replicas) matrix of receive_time columns."""
+        return np.column_stack([self.receive_column(i, start, stop) for i in replicas])
+
+    def average_deliver_time(self):
+        """Return the average deliver_time of every transaction, accumulated one column at a time."""
+        total = np.zeros(self.t)
+        for i in range(self.n):
+            total += self._original_deliver_column(i, 0, self.t)
+        return total / self.n
+
+    def sort_by_average_deliver_time(self):
+        """Set deliver_ID (1-based rank by average deliver time) like sort_transactions_by_average_deliver_time."""
+        self._order = np.argsort(self.average_deliver_time(), kind="stable")
+        self._deliver_ID = np.empty(self.t, dtype=np.int64)
+        self._deliver_ID[self._order] = np.arange(1, self.t + 1)
+
+    def update_deliver_times(self, f):
+        """Override the first f deliver_time columns like update_transaction_deliver_times."""
+        self.faulty = f
+
+    def transactions(self):
+        """
+        Materialize the workload as Transaction objects.
+
+        :return: List of Transaction objects in deliver_ID order, with deliver_ID set.
+        """
+        deliver = self.deliver_block(range(self.n))
+        receive = self.receive_block(range(self.n))
+        average = self.average_deliver_time()
+        transactions = []
+        for ID in self.order.tolist():
+            transaction = Transaction(ID=ID, send_time=self.s * ID, deliver_time=deliver[ID].tolist(),
+                                      receive_time=receive[ID].tolist())
+            transaction.average_deliver_time = average[ID]
+            transaction.deliver_ID = int(self.deliver_ID[ID])
+            transactions.append(transaction)
+        return transactions
+
+
 def sort_transactions_by_average_deliver_time(transactions):
     """
     Sort a list of transactions based on their average deliver time and update their deliver_ID
     based on their indices in the sorted list.
 
-    :param transactions: List of Transaction objects.
+    :param transactions: List of Transaction objects, or a CounterWorkload.
     """
+    if isinstance(transactions, CounterWorkload):
+        transactions.sort_by_average_deliver_time()
+        return transactions
+
     # Sort transactions by average_deliver_time
     sorted_transactions = sorted(transactions, key=lambda tx: tx.average_deliver_time)
 
@@ -100,6 +247,10 @@ def update_transaction_deliver_times(transactions, t, n, s, d, num_slot, f):
     :param s: The multiplier for send_time.
     :param d: The base delay value to add.
     """
+    if isinstance(transactions, CounterWorkload):
+        transactions.update_deliver_times(f)
+        print("Updated deliver_time[0:f] for all transactions.")
+        return
 
     for transaction in transactions:
         for i in range(f):  # Ensure not to exceed available deliver_time entries
@@ -109,15 +260,35 @@ def update_transaction_deliver_times(transactions, t, n, s, d, num_slot, f):
 
 
 
+def delivery_matrices(transactions):
+    """
+    Collect deliver_time and receive_time of all transactions into t x n matrices.
+
+    :param transactions: A list of Transaction objects with IDs 0 to t-1, or a CounterWorkload.
+    :return: A tuple (deliver, receive) of numpy arrays where row ID holds the times of transaction ID.
+    """
+    if isinstance(transactions, CounterWorkload):
+        replicas = range(transactions.n)
+        return transactions.deliver_block(replicas), transactions.receive_block(replicas)
+    transactions = sorted(transactions, key=lambda txn: txn.ID)
+    deliver = np.array([txn.deliver_time for txn in transactions], dtype=float)
+    receive = np.array([txn.receive_time for txn in transactions], dtype=float)
+    return deliver, receive
+
+
 def generate_local_orderings(transactions, n):
     """
     Generate local orderings by sorting all transactions based on deliver_time[i] for i from 0 to n-1.
     Return a dictionary mapping ID to index in the sorted transactions for each i.
 
-    :param transactions: A list of Transaction objects.
+    :param transactions: A list of Transaction objects, or a CounterWorkload (all n orderings are built,
+                         O(n x t) memory; use iter_local_orderings to hold one at a time).
     :param n: The number of indices to consider in deliver_time.
     :return: A dictionary where keys are indices i, and values are mappings of ID to index in the sorted list.
     """
+    if isinstance(transactions, CounterWorkload):
+        return list(iter_local_orderings(transactions, n))
+
     local_orderings = []
 
     for i in range(n):
@@ -135,6 +306,21 @@ def generate_local_orderings(transactions, n):
     return local_orderings
 
 
+def iter_local_orderings(workload, n):
+    """
+    Yield the local ordering of each replica, regenerating one deliver_time column at a time.
+
+    :param workload: A CounterWorkload (sorted by average deliver time on first use).
+    :param n: The number of replicas to consider.
+    :return: A generator of mappings of ID to index in the sorted order, as in generate_local_orderings.
+    """
+    for i in range(n):
+        column = workload.deliver_column(i)
+        # Sort in deliver_ID order first so ties break exactly as in the materialized mode
+        order = workload.order[np.argsort(column[workload.order], kind="stable")]
+        yield {ID: idx for idx, ID in enumerate(order.tolist())}
+
+
 def __test__():
     t = 1000
     s = 1
@@ -1,4 +1,5 @@
 from transactions import *
+import numpy as np
 
 def Themis_update_positions(transactions, path):
     """
@@ -24,10 +25,108 @@ def update_positions(transactions):
 
 def DAG_update_positions(transactions):
     """
-    Order transactions based on their assigned_timestamp and update their positions.
+    Order transactions based on their DAG_assigned_timestamp and update their positions.
+    Ties, e.g. transactions without any timestamp in the DAG (inf), are ordered by ID.
 
     :param transactions: List of Transaction objects.
     """
-    transactions.sort(key=lambda x: x.DAG_assigned_timestamp)
+    transactions.sort(key=lambda x: (x.DAG_assigned_timestamp, x.ID))
     for idx, transaction in enumerate(transactions):
-        transaction.DAG_pos = idx
\ No newline at end of file
+        transaction.DAG_pos = idx
+
+
+def pompe_timestamps(deliver, receive, f, faulty=0):
+    """
+    Compute Pompe-style timestamps: the median of the first 2f+1 reported timestamps.
+
+    :param deliver: A t x n matrix of reported timestamps (deliver_time of each replica).
+    :param receive: A t x n matrix of the times the reports reached the leader (receive_time).
+    :param f: The number of faulty replicas tolerated.
+    :param faulty: Number of leading replicas whose deliver_time was overridden (0 if none).
+    :return: A tuple (timestamps, num_correct) of numpy arrays indexed by transaction ID, where num_correct
+             is how many of the 2f+1 reports used came from non-faulty replicas.
+    """
+    # Indices of the 2f+1 reports that reach the leader first
+    first = np.argpartition(receive, 2*f, axis=1)[:, :2*f+1]
+    reported = np.take_along_axis(deliver, first, axis=1)
+    # The median of 2f+1 values is the (f+1)-th smallest
+    return np.partition(reported, f, axis=1)[:, f], (first >= faulty).sum(axis=1)
+
+
+def assign_timestamps(transactions, f, faulty=0):
+    """
+    Set assigned_timestamp and num_correct of every transaction using pompe_timestamps.
+
+    :param transactions: List of Transaction objects.
+    :param f: The number of faulty replicas tolerated.
+    :param faulty: Number of leading replicas whose deliver_time was overridden (0 if none).
+    """
+    deliver, receive = delivery_matrices(transactions)
+    timestamps, num_correct = pompe_timestamps(deliver, receive, f, faulty)
+    for transaction in transactions:
+        transaction.assigned_timestamp = timestamps[transaction.ID]
+        transaction.num_correct = num_correct[transaction.ID]
+
+
+def DAG_timestamps(dag_vertices, t, n, num_slot, f):
+    """
+    Compute timestamps using only the deliver_times inside each leader's causal history.
+
+    Leaders are processed in round-ascending order as in construct_dependency_graph. A transaction is
+    assigned by the first leader whose causal history holds at least 2f+1 of its timestamps, taking the
+    (f+1)-th smallest of them; the remaining transactions are assigned by a final leader covering all vertices.
+    initialize_dag_vertices leaves the last t % num_slot transactions of every local ordering out of the DAG,
+    so the final leader may hold fewer than f+1 timestamps of a transaction: it then takes the largest of
+    them, and transactions with no timestamp at all get inf.
+
+    :param dag_vertices: A 2D list of DAGVertex objects with updated causal histories.
+    :param t: Total number of transactions.
+    :param n: Number of replicas.
+    :param num_slot: Number of rounds.
+    :param f: The number of faulty replicas tolerated.
+    :return: A tuple (timestamps, num_useful) of numpy arrays indexed by transaction ID.
+    """
+    timestamps = np.full(t, np.inf)
+    num_useful = np.zeros(t, dtype=int)
+    assigned = np.zeros(t, dtype=bool)
+
+    leader_histories = []
+    for round in range(0, num_slot - 1, 2):
+        for i in range(n):
+            if dag_vertices[i][round].is_leader:
+                leader_histories.append(dag_vertices[i][round].causal_history)
+    leader_histories.append([(i, j) for i in range(n) for j in range(num_slot)])
+
+    for idx, causal_history in enumerate(leader_histories):
+        is_final = idx == len(leader_histories) - 1
+        useful = np.full((t, n), np.inf)
+        for replica, round_number in causal_history:
+            vertex = dag_vertices[replica][round_number]
+            if vertex._ids:
+                useful[np.frombuffer(vertex._ids, dtype=np.intc), replica] = np.frombuffer(vertex._times)
+        counts = np.isfinite(useful).sum(axis=1)
+        ready = ~assigned if is_final else ~assigned & (counts >= 2*f+1)
+        timestamps[ready] = np.partition(useful[ready], f, axis=1)[:, f]
+        if is_final:
+            few = np.nonzero(ready & (counts > 0) & (counts <= f))[0]
+            timestamps[few] = np.sort(useful[few], axis=1)[np.arange(len(few)), counts[few] - 1]
+        num_useful[ready] = counts[ready]
+        assigned |= ready
+
+    return timestamps, num_useful
+
+
+def DAG_assign_timestamps(transactions, dag_vertices, n, num_slot, f):
+    """
+    Set DAG_assigned_timestamp and DAG_num_correct of every transaction using DAG_timestamps.
+
+    :param transactions: List of Transaction objects.
+    :param dag_vertices: A 2D list of DAGVertex objects with updated causal histories.
+    :param n: Number of replicas.
+    :param num_slot: Number of rounds.
+    :param f: The number of faulty replicas tolerated.
+    """
+    timestamps, num_useful = DAG_timestamps(dag_vertices, len(transactions), n, num_slot, f)
+    for transaction in transactions:
+        transaction.DAG_assigned_timestamp = timestamps[transaction.ID]
+        transaction.DAG_num_correct = num_useful[transaction.ID]